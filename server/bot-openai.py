@@ -6,8 +6,8 @@
 
 """Patient Intake Bot Implementation.
 
-This module implements a patient intake bot using OpenAI's GPT-4 model for natural language
-processing. It includes:
+This module implements a patient intake bot using OpenAI's GPT-4o mini model for natural
+language processing. It includes:
 - Real-time audio interaction through Daily
 - Patient information collection workflow
 - Medical history intake (prescriptions, allergies, conditions, visit reasons)
@@ -22,14 +22,19 @@ the conversation flow through a structured patient intake process.
 import asyncio
 import os
 import sys
-from pathlib import Path
+from functools import lru_cache
 
 import aiohttp
+from deepgram import LiveOptions
 from dotenv import load_dotenv
+from flow import get_calendar_manager, get_flow_config, run_in_calendar_thread
 from loguru import logger
 from runner import configure
+from text_aggregators import SentenceFlushAggregator
+from text_filters import FastMarkdownTextFilter
 
 from pipecat.audio.vad.silero import SileroVADAnalyzer
+from pipecat.audio.vad.vad_analyzer import VADParams
 from pipecat.frames.frames import Frame, TTSSpeakFrame, EndFrame
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
@@ -38,18 +43,152 @@ from pipecat.services.cartesia.tts import CartesiaTTSService
 from pipecat.services.deepgram.stt import DeepgramSTTService
 from pipecat.services.openai.llm import OpenAILLMService
 from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+from pipecat.transcriptions.language import Language
 from pipecat.transports.services.daily import DailyParams, DailyTransport
-from pipecat.utils.text.markdown_text_filter import MarkdownTextFilter
 from pipecat_flows import FlowManager
 
-# Add parent directory to path to import from examples
-sys.path.append(str(Path(__file__).parent.parent))
-from flow import flow_config
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 
 load_dotenv(override=True)
 logger.remove(0)
-logger.add(sys.stderr, level="DEBUG")
+# Enqueued sink writes from a background thread so logging never blocks the
+# event loop; set LOG_LEVEL=DEBUG for verbose per-frame output.
+logger.add(
+    sys.stderr,
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    enqueue=True,
+    backtrace=False,
+    diagnose=False,
+)
+
+
+# Spoken as soon as the caller joins to cover the first LLM turn. The flow's
+# first node then has Jessica introduce herself and start the intake.
+JOIN_GREETING = "Hi, thanks for calling Newcast Health Services. Just one moment."
+
+
+def require_env(name: str) -> str:
+    """Return a required environment variable, failing fast if it is unset."""
+    value = os.getenv(name)
+    if not value:
+        raise Exception(f"{name} is not set. Add it to your environment or .env file.")
+    return value
+
+
+# Resolved once at import so a misconfigured process fails before joining a room.
+CARTESIA_API_KEY = require_env("CARTESIA_API_KEY")
+DEEPGRAM_API_KEY = require_env("DEEPGRAM_API_KEY")
+OPENAI_API_KEY = require_env("OPENAI_API_KEY")
+
+
+@lru_cache(maxsize=1)
+def get_vad_analyzer() -> SileroVADAnalyzer:
+    """Return the process-wide Silero VAD analyzer, loading its model once."""
+    # Report end of speech after 250 ms of silence instead of the 800 ms
+    # default; raise `confidence` if barge-in misfires.
+    return SileroVADAnalyzer(
+        params=VADParams(
+            confidence=0.6,
+            start_secs=0.15,
+            stop_secs=0.25,
+            min_volume=0.6,
+        )
+    )
+
 
+def preload_vad_analyzer():
+    """Load the Silero model and run one inference before any audio arrives.
+
+    Feeding a single frame of silence forces ONNX Runtime to finish session
+    setup at process start instead of stalling the caller's first audio packet.
+    Exactly one analysis window is pushed so nothing is left in the VAD buffer.
+    """
+    try:
+        vad = get_vad_analyzer()
+        vad.set_sample_rate(16000)
+        vad.analyze_audio(bytes(vad.num_frames_required() * 2))
+    except Exception as e:
+        logger.warning(f"VAD preload failed: {e}")
+
+
+preload_vad_analyzer()
+
+
+@lru_cache(maxsize=1)
+def get_markdown_filter() -> FastMarkdownTextFilter:
+    """Return the process-wide Markdown filter applied to TTS text."""
+    return FastMarkdownTextFilter()
+
+
+def create_http_session() -> aiohttp.ClientSession:
+    """Create the bot's HTTP session for Daily REST calls.
+
+    The connector keeps connections alive and caches DNS lookups so repeated
+    REST calls skip the TCP/TLS handshake and resolver round-trip. The speech
+    and language services never share this pool: Deepgram and Cartesia stream
+    over their own websockets and OpenAI uses its own httpx client, so TTS
+    audio egress cannot head-of-line block STT partials or LLM tokens.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=100,
+        limit_per_host=20,
+        ttl_dns_cache=300,
+        keepalive_timeout=75,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+async def warm_up_llm(llm: OpenAILLMService):
+    """Open the OpenAI HTTPS connection before the first conversation turn.
+
+    Deepgram and Cartesia connect their websockets when the pipeline starts,
+    but the OpenAI client only connects on its first request. A lightweight
+    model lookup pays the DNS/TLS cost up front without generating tokens.
+    """
+    try:
+        await llm._client.models.retrieve(llm.model_name)
+    except Exception as e:
+        logger.warning(f"LLM warmup failed: {e}")
+
+
+async def warm_up_calendar():
+    """Authenticate with Google Calendar before the first availability check."""
+    try:
+        await run_in_calendar_thread(get_calendar_manager)
+    except Exception as e:
+        logger.warning(f"Calendar warmup failed: {e}")
+
+
+async def log_participant_left(participant):
+    """Log a departed participant, formatting it only when debug logging is on."""
+    logger.opt(lazy=True).debug("Participant left: {}", lambda: participant)
+
+
+# Auxiliary work that must never delay the STT -> LLM -> TTS path. Event
+# handlers enqueue `(event, payload)` and the background worker dispatches here.
+BACKGROUND_HANDLERS = {
+    "participant_left": log_participant_left,
+}
+
+
+async def run_background_worker(queue: asyncio.Queue):
+    """Process auxiliary events off the response critical path.
+
+    A `None` item stops the worker after everything queued before it is handled.
+    """
+    while True:
+        item = await queue.get()
+        if item is None:
+            break
+        event, payload = item
+        try:
+            await BACKGROUND_HANDLERS[event](payload)
+        except Exception as e:
+            logger.error(f"Background handler for {event} failed: {e}")
 
 
 async def main():
@@ -62,7 +201,7 @@ async def main():
     - Patient intake workflow management
     - Google Calendar appointment scheduling
     """
-    async with aiohttp.ClientSession() as session:
+    async with create_http_session() as session:
         (room_url, token) = await configure(session)
 
         # Set up Daily transport with video/audio parameters
@@ -72,20 +211,49 @@ async def main():
             "Patient Intake Bot",
             DailyParams(
                 audio_in_enabled=True,
+                audio_in_sample_rate=16000,
                 audio_out_enabled=True,
+                audio_out_sample_rate=16000,
                 video_out_enabled=False,
-                vad_analyzer=SileroVADAnalyzer(),
+                vad_analyzer=get_vad_analyzer(),
             ),
         )
 
+        # Stream over Cartesia's websocket with Sonic-2, producing raw 16 kHz
+        # PCM that matches the transport so no resampling or decoding happens.
         tts = CartesiaTTSService(
-            api_key=os.getenv("CARTESIA_API_KEY"),
+            api_key=CARTESIA_API_KEY,
             voice_id="9626c31c-bec5-4cca-baa8-f8ba9e84c8bc",
-            text_filter=MarkdownTextFilter(),
+            model="sonic-2",
+            sample_rate=16000,
+            encoding="pcm_s16le",
+            container="raw",
+            params=CartesiaTTSService.InputParams(language=Language.EN),
+            text_filter=get_markdown_filter(),
+            text_aggregator=SentenceFlushAggregator(),
         )
 
-        stt = DeepgramSTTService(api_key=os.getenv("DEEPGRAM_API_KEY"))
-        llm = OpenAILLMService(api_key=os.getenv("OPENAI_API_KEY"), model="gpt-4o")
+        # Pin the audio format and language so Deepgram skips format detection
+        # and language identification on every utterance.
+        stt = DeepgramSTTService(
+            api_key=DEEPGRAM_API_KEY,
+            live_options=LiveOptions(
+                model="nova-3",
+                language="en-US",
+                encoding="linear16",
+                sample_rate=16000,
+                channels=1,
+                smart_format=True,
+                punctuate=True,
+                interim_results=True,
+            ),
+        )
+        # Intake turns are short slot-filling/routing steps, so a smaller model
+        # gives much lower time-to-first-token; override with OPENAI_MODEL.
+        llm = OpenAILLMService(
+            api_key=OPENAI_API_KEY,
+            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        )
 
         context = OpenAILLMContext()
         context_aggregator = llm.create_context_aggregator(context)
@@ -105,34 +273,69 @@ async def main():
 
         task = PipelineTask(
             pipeline,
+            # Keep the whole pipeline at 16 kHz to avoid per-frame resampling.
+            # Metrics add per-frame work, so they are opt-in with METRICS=1.
             params=PipelineParams(
                 allow_interruptions=True,
+                audio_in_sample_rate=16000,
+                audio_out_sample_rate=16000,
+                enable_metrics=os.getenv("METRICS", "0") == "1",
+                enable_usage_metrics=False,
+                report_only_initial_ttfb=True,
             ),
         )
 
+        bg_queue: asyncio.Queue = asyncio.Queue()
+
         # Initialize flow manager with LLM and flow config
         flow_manager = FlowManager(
             task=task,
             llm=llm,
             context_aggregator=context_aggregator,
-            flow_config=flow_config,
+            flow_config=get_flow_config(),
         )
 
         @transport.event_handler("on_first_participant_joined")
         async def on_first_participant_joined(transport, participant):
-            await transport.capture_participant_transcription(participant["id"])
-            # Initialize the flow processor
-            await flow_manager.initialize()
+            await task.queue_frame(TTSSpeakFrame(JOIN_GREETING))
+            # Subscribing to the transcript and initializing the flow (which
+            # queues the greeting turn) are independent, so run them together.
+            await asyncio.gather(
+                transport.capture_participant_transcription(participant["id"]),
+                flow_manager.initialize(),
+            )
 
         @transport.event_handler("on_participant_left")
         async def on_participant_left(transport, participant, reason):
-            print(f"Participant left: {participant}")
+            bg_queue.put_nowait(("participant_left", participant))
             await task.cancel()
 
         runner = PipelineRunner()
 
-        await runner.run(task)
+        # Calendar authentication can block on an interactive OAuth flow, so it
+        # runs outside the task group and is cancelled once the pipeline ends
+        # rather than holding up shutdown.
+        calendar_warmup = asyncio.create_task(warm_up_calendar())
+
+        # Helper tasks live in the same group as the pipeline run, so they are
+        # awaited (or cancelled) together when the pipeline finishes or fails.
+        try:
+            async with asyncio.TaskGroup() as tg:
+                # Warm the LLM connection while the transport joins the room and
+                # waits for the participant, so the greeting turn doesn't pay for it.
+                tg.create_task(warm_up_llm(llm))
+                tg.create_task(run_background_worker(bg_queue))
+
+                await runner.run(task)
+                bg_queue.put_nowait(None)
+        finally:
+            calendar_warmup.cancel()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop's libuv-based loop lowers per-await overhead for the many small
+    # audio frames moving through the pipeline; fall back to asyncio if absent.
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
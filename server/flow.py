@@ -4,19 +4,20 @@
 # SPDX-License-Identifier: BSD 2-Clause License
 #
 
+import asyncio
 import datetime
+import functools
+import random
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, TypedDict, Optional
+from typing import Dict, List, Optional, Tuple, TypedDict, Union
 
 from loguru import logger
 
-# Google Calendar imports
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-
 from pipecat_flows import (
     ContextStrategy,
     ContextStrategyConfig,
@@ -25,16 +26,93 @@ from pipecat_flows import (
     FlowResult,
 )
 
+__all__ = [
+    "CalendarManager",
+    "DateUtility",
+    "get_calendar_manager",
+    "get_flow_config",
+    "normalize_time",
+    "run_in_calendar_thread",
+]
+
 # Google Calendar Configuration
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
+# How long a day's calendar events are reused between availability checks
+EVENTS_CACHE_TTL_SECONDS = 30
+
+# Business hours for appointments, in minutes since midnight (9 AM - 5 PM)
+BUSINESS_START_MINUTE = 9 * 60
+BUSINESS_END_MINUTE = 17 * 60
+SLOT_STEP_MINUTES = 30
+
+# Every bookable slot start within business hours, with its "HH:MM" label
+SLOT_START_MINUTES = tuple(range(BUSINESS_START_MINUTE, BUSINESS_END_MINUTE, SLOT_STEP_MINUTES))
+SLOT_LABELS = tuple(f"{minute // 60:02d}:{minute % 60:02d}" for minute in SLOT_START_MINUTES)
+
+# Refresh OAuth tokens this long before they expire
+TOKEN_REFRESH_LEEWAY = datetime.timedelta(minutes=5)
+
+# Socket timeout for Google Calendar API requests
+CALENDAR_HTTP_TIMEOUT_SECONDS = 10
+
+# Persona shared by every role prompt
+AGENT_NAME = "Jessica"
+PRACTICE_NAME = "Newcast Health Services"
+
+# Static role prompt that opens every intake conversation. The intake nodes
+# only append task messages after it, so the request prefix stays byte-identical
+# (and cacheable by the LLM provider) until verify replaces the context with a
+# summary and schedule_date sets SCHEDULING_ROLE_PROMPT.
+INTAKE_ROLE_PROMPT = f"You are {AGENT_NAME}, an agent for {PRACTICE_NAME}. You must ALWAYS use one of the available functions to progress the conversation. Be professional but friendly."
+
+# How dates are spoken to the patient, stated once for every scheduling node
+DATE_PRESENTATION_RULE = "Always present dates to users in a friendly format like 'Friday July 18th, 2025' and never show YYYY-MM-DD."
+
+# Role prompt for the scheduling half of the conversation. It stays in the
+# context for every scheduling node, so rules shared by those nodes live here.
+SCHEDULING_ROLE_PROMPT = f"You are {AGENT_NAME}, a scheduling assistant for {PRACTICE_NAME}. You've completed the patient intake and now need to schedule their appointment. Be professional but friendly and helpful. {DATE_PRESENTATION_RULE}"
+
+# Retry policy for transient Google Calendar API failures
+CALENDAR_RETRY_ATTEMPTS = 3
+CALENDAR_RETRY_BASE_DELAY_SECONDS = 0.2
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+def execute_with_retry(request, attempts: int = CALENDAR_RETRY_ATTEMPTS,
+                       base_delay: float = CALENDAR_RETRY_BASE_DELAY_SECONDS):
+    """Execute a Google API request, retrying transient failures with backoff."""
+    from googleapiclient.errors import HttpError
+    
+    for attempt in range(attempts):
+        try:
+            return request.execute()
+        except (HttpError, TimeoutError, ConnectionError) as e:
+            status = e.resp.status if isinstance(e, HttpError) else None
+            retryable = status is None or status in RETRYABLE_STATUS_CODES
+            if not retryable or attempt == attempts - 1:
+                raise
+            delay = base_delay * 2 ** attempt + random.random() * 0.1
+            logger.warning(f"Calendar request failed ({e!r}), retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+# Ordinal suffix for each day of the month (1st, 2nd, 3rd, 4th, ..., 31st)
+ORDINAL_SUFFIXES = tuple(
+    "th" if 4 <= day <= 20 or 24 <= day <= 30 else ("st", "nd", "rd")[day % 10 - 1]
+    for day in range(32)
+)
+
 class DateUtility:
     """Utility class for date operations and conversions."""
     
     @staticmethod
     def get_current_date_info():
         """Get current date information in user-friendly format."""
-        today = datetime.date.today()
+        return DateUtility._date_info(datetime.date.today())
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _date_info(today: datetime.date) -> dict:
+        """Build the date information for a day; cached until the day changes."""
         return {
             "today_formatted": today.strftime('%A %B %d, %Y'),  # "Friday July 19, 2025"
             "today_iso": today.strftime('%Y-%m-%d'),            # For internal use
@@ -46,108 +124,202 @@ class DateUtility:
         }
     
     @staticmethod
-    def format_date_user_friendly(date_str: str) -> str:
-        """Convert YYYY-MM-DD format to user-friendly format like 'Friday July 18th, 2025'."""
+    @functools.lru_cache(maxsize=512)
+    def format_date_user_friendly(date_str: Union[str, datetime.date]) -> str:
+        """Convert YYYY-MM-DD format to user-friendly format like 'Friday July 18th, 2025'.
+
+        Already-parsed dates are formatted directly.
+        """
         try:
-            date_obj = datetime.datetime.strptime(date_str, '%Y-%m-%d')
+            if isinstance(date_str, datetime.date):
+                date_obj = date_str
+            else:
+                date_obj = datetime.datetime.strptime(date_str, '%Y-%m-%d')
             # Add ordinal suffix (1st, 2nd, 3rd, 4th, etc.)
             day = date_obj.day
-            if 4 <= day <= 20 or 24 <= day <= 30:
-                suffix = "th"
-            else:
-                suffix = ["st", "nd", "rd"][day % 10 - 1]
-            
-            return date_obj.strftime(f'%A %B {day}{suffix}, %Y')
+            return date_obj.strftime(f'%A %B {day}{ORDINAL_SUFFIXES[day]}, %Y')
         except ValueError:
             return date_str  # Return as-is if can't parse
 
 class CalendarManager:
     """Manages Google Calendar operations."""
     
+    # Credentials and API client are shared by every instance so rebuilding the
+    # manager doesn't re-read token.json or rebuild the client. The lock makes
+    # sure only one thread loads or refreshes them at a time.
+    _creds = None
+    _service = None
+    _auth_lock = threading.Lock()
+    # One keep-alive HTTP transport for all Calendar requests, so list and
+    # insert calls reuse the same TLS connection instead of reconnecting.
+    _http = None
+    
     def __init__(self):
         self.service = None
+        # (calendar_id, date_str) -> (fetched_at, sorted [(start_minute, end_minute), ...])
+        self._events_cache: Dict[Tuple[str, str], Tuple[float, List[Tuple[int, int]]]] = {}
         self._authenticate()
     
+    @staticmethod
+    def _expires_soon(creds) -> bool:
+        """Check whether credentials expire within the refresh leeway."""
+        if creds.expiry is None:
+            return False
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return creds.expiry - now < TOKEN_REFRESH_LEEWAY
+    
     def _authenticate(self):
-        """Authenticate with Google Calendar API."""
-        creds = None
+        """Authenticate with Google Calendar API, reusing cached credentials."""
+        # Google client libraries are imported here so modules that only need
+        # the date/time helpers don't pay for loading them
+        import httplib2
+        from google_auth_httplib2 import AuthorizedHttp
+        from googleapiclient.discovery import build
+        
+        cls = type(self)
+        with cls._auth_lock:
+            creds = cls._creds
+            if creds is None or not creds.valid or self._expires_soon(creds):
+                creds = self._load_credentials(creds)
+            if cls._http is None:
+                cls._http = httplib2.Http(timeout=CALENDAR_HTTP_TIMEOUT_SECONDS)
+            if cls._service is None or creds is not cls._creds:
+                # Build from the discovery document bundled with googleapiclient
+                # rather than fetching it, and skip the on-disk discovery cache.
+                cls._service = build(
+                    'calendar', 'v3',
+                    http=AuthorizedHttp(creds, http=cls._http),
+                    static_discovery=True,
+                    cache_discovery=False,
+                )
+            cls._creds = creds
+        self.service = cls._service
+    
+    def _load_credentials(self, creds=None):
+        """Load, refresh, or obtain credentials, saving them for the next run."""
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        
         token_path = Path(__file__).parent / 'token.json'
         credentials_path = Path(__file__).parent / 'credentials.json'
         
         # Load existing token
-        if token_path.exists():
+        if creds is None and token_path.exists():
             creds = Credentials.from_authorized_user_file(str(token_path), SCOPES)
         
+        # Nothing to do while the token is valid and not about to expire
+        if creds and creds.valid and not self._expires_soon(creds):
+            return creds
+        
         # If there are no (valid) credentials available, let the user log in
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                if not credentials_path.exists():
-                    raise FileNotFoundError(
-                        f"credentials.json not found at {credentials_path}. "
-                        "Please follow the setup guide in CALENDAR_SETUP.md"
-                    )
-                flow = InstalledAppFlow.from_client_secrets_file(str(credentials_path), SCOPES)
-                creds = flow.run_local_server(port=0)
-            
-            # Save the credentials for the next run
-            with open(token_path, 'w') as token:
-                token.write(creds.to_json())
+        if creds and creds.refresh_token:
+            creds.refresh(Request())
+        else:
+            if not credentials_path.exists():
+                raise FileNotFoundError(
+                    f"credentials.json not found at {credentials_path}. "
+                    "Please follow the setup guide in CALENDAR_SETUP.md"
+                )
+            flow = InstalledAppFlow.from_client_secrets_file(str(credentials_path), SCOPES)
+            creds = flow.run_local_server(port=0)
+        
+        # Save the credentials for the next run
+        with open(token_path, 'w') as token:
+            token.write(creds.to_json())
+        
+        return creds
+    
+    @staticmethod
+    def _event_minute(event_time: dict, day: datetime.date, round_up: bool = False) -> int:
+        """Convert an event's start/end to minutes since midnight of `day`.
+
+        Times use the event's own wall clock. Seconds round down, or up when
+        `round_up` is set, so partial minutes still count as busy.
+        """
+        if 'dateTime' not in event_time:
+            # All-day events only carry a date and span whole days
+            return (datetime.date.fromisoformat(event_time['date']) - day).days * 24 * 60
+        
+        event_dt = datetime.datetime.fromisoformat(event_time['dateTime'].replace('Z', '+00:00'))
+        minute = (event_dt.date() - day).days * 24 * 60 + event_dt.hour * 60 + event_dt.minute
+        if round_up and (event_dt.second or event_dt.microsecond):
+            minute += 1
+        return minute
+    
+    def _get_events(self, date_str: str, start_time: datetime.datetime, end_time: datetime.datetime,
+                    calendar_id: str = 'primary') -> List[Tuple[int, int]]:
+        """Get the busy intervals in a window as sorted minutes since the day's midnight.
+
+        Results are reused for EVENTS_CACHE_TTL_SECONDS.
+        """
+        cache_key = (calendar_id, date_str)
+        cached = self._events_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < EVENTS_CACHE_TTL_SECONDS:
+            return cached[1]
+        
+        events_result = execute_with_retry(self.service.events().list(
+            calendarId=calendar_id,
+            timeMin=start_time.isoformat() + 'Z',
+            timeMax=end_time.isoformat() + 'Z',
+            singleEvents=True,
+            orderBy='startTime'
+        ))
+        
+        # Parse once here so slot checks are plain integer comparisons
+        day = start_time.date()
+        events = sorted(
+            (self._event_minute(event['start'], day), self._event_minute(event['end'], day, round_up=True))
+            for event in events_result.get('items', [])
+        )
         
-        self.service = build('calendar', 'v3', credentials=creds)
+        self._events_cache[cache_key] = (time.monotonic(), events)
+        return events
     
-    def get_available_slots(self, date_str: str, duration_minutes: int = 30) -> List[str]:
-        """Get available appointment slots for a given date."""
+    def _is_slot_free(self, date_str: str, start_minute: int, duration_minutes: int,
+                      calendar_id: str = 'primary') -> bool:
+        """Check a slot against the cached events for its day, without an API call.
+
+        Returns True when the day isn't cached (or the cache expired), leaving the
+        final say to Google Calendar.
+        """
+        cached = self._events_cache.get((calendar_id, date_str))
+        if not cached or time.monotonic() - cached[0] >= EVENTS_CACHE_TTL_SECONDS:
+            return True
+        end_minute = start_minute + duration_minutes
+        return not any(start < end_minute and end > start_minute for start, end in cached[1])
+    
+    def get_available_slots(self, date_str: Union[str, datetime.date], duration_minutes: int = 30) -> List[str]:
+        """Get available appointment slots for a given date (YYYY-MM-DD or a date)."""
         try:
-            # Parse the date
-            target_date = datetime.datetime.strptime(date_str, '%Y-%m-%d')
+            # Parse the date unless the caller already did
+            if isinstance(date_str, datetime.date):
+                target_date = datetime.datetime.combine(date_str, datetime.time())
+                date_str = date_str.isoformat()
+            else:
+                target_date = datetime.datetime.strptime(date_str, '%Y-%m-%d')
             
             # Define business hours (9 AM - 5 PM)
-            start_time = target_date.replace(hour=9, minute=0, second=0, microsecond=0)
-            end_time = target_date.replace(hour=17, minute=0, second=0, microsecond=0)
-            
-            # Get existing events for the day
-            start_time_iso = start_time.isoformat() + 'Z'
-            end_time_iso = end_time.isoformat() + 'Z'
-            
-            events_result = self.service.events().list(
-                calendarId='primary',
-                timeMin=start_time_iso,
-                timeMax=end_time_iso,
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
+            start_time = target_date + datetime.timedelta(minutes=BUSINESS_START_MINUTE)
+            end_time = target_date + datetime.timedelta(minutes=BUSINESS_END_MINUTE)
             
-            events = events_result.get('items', [])
+            # Get existing events for the day, sorted by start
+            events = self._get_events(date_str, start_time, end_time)
             
-            # Generate all possible slots
+            # Sweep the slots and events together. Slots only move forward, so an
+            # event that ends before a slot starts can be skipped for good.
             available_slots = []
-            current_time = start_time
-            
-            while current_time + datetime.timedelta(minutes=duration_minutes) <= end_time:
-                slot_end = current_time + datetime.timedelta(minutes=duration_minutes)
-                
-                # Check if this slot conflicts with any existing event
-                is_available = True
-                for event in events:
-                    event_start = datetime.datetime.fromisoformat(
-                        event['start'].get('dateTime', event['start'].get('date')).replace('Z', '+00:00')
-                    ).replace(tzinfo=None)
-                    event_end = datetime.datetime.fromisoformat(
-                        event['end'].get('dateTime', event['end'].get('date')).replace('Z', '+00:00')
-                    ).replace(tzinfo=None)
-                    
-                    # Check for overlap
-                    if (current_time < event_end and slot_end > event_start):
-                        is_available = False
-                        break
-                
-                if is_available:
-                    available_slots.append(current_time.strftime('%H:%M'))
+            event_index = 0
+            for slot_start, slot_label in zip(SLOT_START_MINUTES, SLOT_LABELS):
+                slot_end = slot_start + duration_minutes
+                if slot_end > BUSINESS_END_MINUTE:
+                    break
+                while event_index < len(events) and events[event_index][1] <= slot_start:
+                    event_index += 1
                 
-                # Move to next slot (every 30 minutes)
-                current_time += datetime.timedelta(minutes=30)
+                # Free if the next relevant event starts after this slot ends
+                if event_index == len(events) or events[event_index][0] >= slot_end:
+                    available_slots.append(slot_label)
             
             return available_slots
             
@@ -158,6 +330,8 @@ class CalendarManager:
     def schedule_appointment(self, date_str: str, time_str: str, patient_name: str, 
                            patient_email: str = None, duration_minutes: int = 30, description: str = "") -> bool:
         """Schedule an appointment in Google Calendar."""
+        from googleapiclient.errors import HttpError
+        
         try:
             # Parse date and time
             appointment_datetime = datetime.datetime.strptime(
@@ -170,9 +344,21 @@ class CalendarManager:
                 logger.error("Cannot schedule appointment: patient_email is required")
                 return False
             
+            # Skip the insert when recently fetched events already show a conflict
+            start_minute = appointment_datetime.hour * 60 + appointment_datetime.minute
+            if not self._is_slot_free(date_str, start_minute, duration_minutes):
+                logger.warning(f"Cannot schedule appointment: {date_str} {time_str} is no longer available")
+                return False
+            
             # Create event
             attendees = [{'email': patient_email, 'responseStatus': 'needsAction'}]
+            # A fresh id per booking (hex digits are base32hex-safe) makes retries
+            # of this insert idempotent: Google rejects a second event with the
+            # same id. It must not repeat across bookings, since Google keeps the
+            # ids of deleted and cancelled events.
+            event_id = uuid.uuid4().hex
             event = {
+                'id': event_id,
                 'summary': f'Appointment with {patient_name}',
                 'description': description,
                 'start': {
@@ -199,58 +385,86 @@ class CalendarManager:
             logger.info(f"Creating calendar event with attendees: {attendees}")
             
             # Create the event and send invitations
-            event = self.service.events().insert(
-                calendarId='primary', 
-                body=event,
-                sendUpdates='all'  # This ensures invitations are sent to all attendees
-            ).execute()
-            logger.info(f'Event created: {event.get("htmlLink")}')
+            try:
+                event = execute_with_retry(self.service.events().insert(
+                    calendarId='primary', 
+                    body=event,
+                    sendUpdates='all'  # This ensures invitations are sent to all attendees
+                ))
+                logger.info(f'Event created: {event.get("htmlLink")}')
+            except HttpError as e:
+                if e.resp.status != 409:
+                    raise
+                # An earlier attempt of this same insert already created the event
+                logger.info(f"Event {event_id} already exists")
+            # The day's cached events no longer include this appointment
+            self._events_cache.pop(('primary', date_str), None)
             return True
             
         except Exception as e:
             logger.error(f"Error scheduling appointment: {e}")
             return False
 
-# Initialize calendar manager
-calendar_manager = CalendarManager()
+@functools.cache
+def get_calendar_manager() -> CalendarManager:
+    """Get the shared calendar manager, authenticating on first use."""
+    return CalendarManager()
+
+# Google Calendar calls block on HTTPS, so they run off the event loop. A single
+# worker serializes them because the shared httplib2 transport isn't thread-safe.
+CALENDAR_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="calendar")
+
+async def run_in_calendar_thread(func):
+    """Run blocking Google Calendar work without stalling the event loop.
+
+    `func` takes no arguments and should fetch the manager itself, so that
+    first-use authentication also happens on the calendar thread.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(CALENDAR_EXECUTOR, func)
+
+# Matches "14:30", "2pm", "2:30 PM", "2 : 30 pm", "9" -> (hour, minute, meridiem)
+TIME_RE = re.compile(r'^(\d{1,2})(?:\s*:\s*(\d{2}))?\s*(am|pm)?$')
 
 def normalize_time(time_str: str) -> str:
     """Convert various time formats to HH:MM format."""
-    time_str = time_str.lower().strip()
+    time_str = time_str.strip()
     
-    # Handle common patterns
-    if 'am' in time_str or 'pm' in time_str:
-        # Parse 12-hour format
-        try:
-            # Clean up the string
-            time_str = time_str.replace(' ', '')
-            if ':' not in time_str:
-                # Handle cases like "2pm" -> "2:00pm"
-                time_str = time_str.replace('am', ':00am').replace('pm', ':00pm')
-            
-            # Parse and convert to 24-hour format
-            time_obj = datetime.datetime.strptime(time_str, '%I:%M%p')
-            return time_obj.strftime('%H:%M')
-        except ValueError:
-            pass
+    # Bare hour numbers like "9" or "14" skip lowercasing and the regex; only
+    # business hours are accepted. isdecimal, not isdigit, because int()
+    # rejects digit characters such as "²".
+    if time_str.isdecimal():
+        hour = int(time_str)
+        return f"{hour:02d}:00" if 9 <= hour <= 17 else time_str
     
-    # Handle 24-hour format or already normalized
-    try:
-        # Try to parse as HH:MM
-        time_obj = datetime.datetime.strptime(time_str, '%H:%M')
+    time_str = time_str.lower()
+    match = TIME_RE.match(time_str)
+    if not match:
+        return time_str  # Return as-is if can't normalize
+    
+    hour = int(match[1])
+    minute = int(match[2] or 0)
+    meridiem = match[3]
+    
+    if meridiem:
+        # 12-hour format, e.g. "2pm" or "2:30pm"
+        if not 1 <= hour <= 12:
+            return time_str
+        if meridiem == 'pm' and hour < 12:
+            hour += 12
+        elif meridiem == 'am' and hour == 12:
+            hour = 0
+    elif match[2] is None:
+        # Just an hour number; only accept business hours
+        if not 9 <= hour <= 17:
+            return time_str
+    elif hour > 23:
         return time_str
-    except ValueError:
-        pass
     
-    # Handle just hour numbers
-    try:
-        hour = int(time_str)
-        if 9 <= hour <= 17:  # Business hours
-            return f"{hour:02d}:00"
-    except ValueError:
-        pass
+    if minute > 59:
+        return time_str
     
-    return time_str  # Return as-is if can't normalize
+    return f"{hour:02d}:{minute:02d}"
 
 
 # Type definitions
@@ -362,12 +576,7 @@ async def revise_information(args: FlowArgs) -> tuple[None, str]:
 
 
 async def confirm_information(args: FlowArgs) -> tuple[None, str]:
-    """Handler to confirm all collected information."""
-    return None, "confirm"
-
-
-async def complete_intake(args: FlowArgs) -> tuple[None, str]:
-    """Handler to complete the intake process."""
+    """Handler to confirm all collected information and move on to scheduling."""
     return None, "schedule_date"
 
 
@@ -389,21 +598,27 @@ async def check_availability(args: FlowArgs) -> tuple[DateCheckResult, str]:
     date = args["date"].strip()
     preferred_time = args.get("preferred_time", "").strip()
     
-    # Validate date format - expect YYYY-MM-DD from AI conversion
+    # Validate date format - expect YYYY-MM-DD from AI conversion. Parsed once
+    # here and passed along so nothing downstream parses it again. fromisoformat
+    # also accepts forms like "20250718" and ISO week dates, so the round trip
+    # rejects anything that isn't exactly YYYY-MM-DD.
     try:
-        datetime.datetime.strptime(date, '%Y-%m-%d')
+        requested_date = datetime.date.fromisoformat(date)
     except ValueError:
+        requested_date = None
+    if requested_date is None or requested_date.isoformat() != date:
         raise ValueError("Date must be in YYYY-MM-DD format")
     
     # Check if date is in the future
     today = datetime.date.today()
-    requested_date = datetime.datetime.strptime(date, '%Y-%m-%d').date()
     
     if requested_date <= today:
         raise ValueError("Please select a future date")
     
     # Get available slots
-    available_slots = calendar_manager.get_available_slots(date)
+    available_slots = await run_in_calendar_thread(
+        lambda: get_calendar_manager().get_available_slots(requested_date)
+    )
     
     # If user specified a preferred time, check if it's available
     if preferred_time:
@@ -416,7 +631,7 @@ async def check_availability(args: FlowArgs) -> tuple[DateCheckResult, str]:
     
     return DateCheckResult(
         date=date, 
-        date_formatted=DateUtility.format_date_user_friendly(date),
+        date_formatted=DateUtility.format_date_user_friendly(requested_date),
         available_slots=available_slots, 
         preferred_time=preferred_time
     ), "schedule_time"
@@ -446,12 +661,14 @@ async def schedule_appointment_handler(args: FlowArgs) -> tuple[AppointmentSched
         reasons_text = "General consultation"
     
     # Schedule the appointment
-    success = calendar_manager.schedule_appointment(
-        date_str=date,
-        time_str=time,
-        patient_name=patient_name,
-        patient_email=patient_email,
-        description=f"Reason for visit: {reasons_text}"
+    success = await run_in_calendar_thread(
+        lambda: get_calendar_manager().schedule_appointment(
+            date_str=date,
+            time_str=time,
+            patient_name=patient_name,
+            patient_email=patient_email,
+            description=f"Reason for visit: {reasons_text}"
+        )
     )
     
     if success:
@@ -480,22 +697,31 @@ async def confirm_final_appointment(args: FlowArgs) -> tuple[None, str]:
     return None, "end"
 
 
-def get_current_datetime_context() -> str:
-    """Generate current date and time context for system prompts."""
+def get_current_date_context() -> str:
+    """Generate current date context for system prompts.
+
+    Only changes once a day, so prompts built from it keep a stable prefix.
+    """
+    return _date_context(datetime.datetime.now(datetime.timezone.utc).date())
+
+
+@functools.lru_cache(maxsize=1)
+def _date_context(today: datetime.date) -> str:
+    """Format the date context for a day; cached until the UTC day changes."""
+    day = today.day
+    return f"Today is {today.strftime('%A')}, {today.strftime('%B')} {day}{ORDINAL_SUFFIXES[day]}, {today.year}. Use this information when interpreting relative date requests like 'tomorrow', 'next week', etc."
+
+
+def get_current_time_context() -> str:
+    """Generate current time context, kept after the stable parts of a prompt."""
     now = datetime.datetime.now(datetime.timezone.utc)
-    day_name = now.strftime('%A')
-    month_name = now.strftime('%B')
-    day = now.day
-    year = now.year
-    time_str = now.strftime('%I:%M %p UTC')
-    
-    # Add ordinal suffix to day
-    if 4 <= day <= 20 or 24 <= day <= 30:
-        suffix = "th"
-    else:
-        suffix = ["st", "nd", "rd"][day % 10 - 1]
-    
-    return f"Today is {day_name}, {month_name} {day}{suffix}, {year}. The current time is {time_str}. Use this information when interpreting relative date requests like 'tomorrow', 'next week', etc."
+    return _time_context(now.hour, now.minute)
+
+
+@functools.lru_cache(maxsize=1)
+def _time_context(hour: int, minute: int) -> str:
+    """Format the time context for a minute; cached until the minute changes."""
+    return f"The current time is {datetime.time(hour, minute).strftime('%I:%M %p UTC')}."
 
 
 # Flow Configuration - Patient Intake with Calendar Scheduling
@@ -541,449 +767,428 @@ def get_current_datetime_context() -> str:
 #    - Reviews all collected information with patient
 #    - Functions:
 #      * revise_information (returns to prescriptions if changes needed)
-#      * confirm_information (transitions to confirmation after approval)
-#    - Expected flow: Review all info -> Confirm accuracy -> End or revise
+#      * confirm_information (transitions to scheduling after approval)
+#    - Expected flow: Review all info -> Confirm accuracy -> Schedule or revise
 #
-# 7. confirm
-#    - Confirms all information and prepares for scheduling
+# 7. schedule_date
+#    - Thanks the patient for the intake, then collects preferred appointment date
 #    - Functions:
-#      * complete_intake (transitions to scheduling)
-#    - Expected flow: Final confirmation -> Begin scheduling
-#
-# 8. schedule_date
-#    - Collects preferred appointment date
-#    - Functions:
-#      * get_current_date (gets current date context)
 #      * check_availability (checks available slots for date)
+#      * get_current_date (gets current date context)
 #    - Expected flow: Ask for date -> Check availability -> Show available times
 #
-# 9. schedule_time
+# 8. schedule_time
 #    - Shows available times and collects time preference
 #    - Functions:
 #      * schedule_appointment_handler (schedules appointment with patient info)
 #    - Expected flow: Show times -> Collect preference -> Schedule appointment
 #
-# 10. reschedule_appointment
-#     - Handles scheduling errors
-#     - Functions:
-#       * reschedule_appointment (restarts scheduling process)
-#     - Expected flow: Error -> Restart scheduling
+# 9. reschedule_appointment
+#    - Handles scheduling errors
+#    - Functions:
+#      * reschedule_appointment (restarts scheduling process)
+#    - Expected flow: Error -> Restart scheduling
 #
-# 11. confirm_appointment
+# 10. confirm_appointment
 #     - Confirms successful appointment scheduling
 #     - Functions:
 #       * confirm_final_appointment (ends conversation)
 #     - Expected flow: Confirm details -> End
 #
-# 12. end
+# 11. end
 #     - Final state that closes the conversation
 #     - No functions available
 #     - Pre-action: Thank you message
 #     - Post-action: Ends conversation
 
-flow_config: FlowConfig = {
-    "initial_node": "collect_info",
-    "nodes": {
-        "collect_info": {
-            "role_messages": [
-                {
-                    "role": "system",
-                    "content": "You are Jessica, an agent for Newcast Health Services. You must ALWAYS use one of the available functions to progress the conversation. Be professional but friendly.",
-                }
-            ],
-            "task_messages": [
-                {
-                    "role": "system",
-                    "content": "Start by introducing yourself and explaining that you'll be conducting a patient intake. Ask for the patient's full name and date of birth. When they provide their birthday in any format, convert it to YYYY-MM-DD format before calling the collect_patient_info function.",
-                }
-            ],
-            "functions": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "collect_patient_info",
-                        "handler": collect_patient_info,
-                        "description": "Collect the patient's name and birthday. Both fields are required and will be validated. Once collected, proceed to prescription collection.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "name": {
-                                    "type": "string",
-                                    "description": "The patient's full name",
+def system_messages(*contents: str) -> List[dict]:
+    """Build a node's role or task message list from system prompt strings."""
+    return [{"role": "system", "content": content} for content in contents]
+
+# Parameter schema shared by every function that takes no arguments
+EMPTY_PARAMETERS = {"type": "object", "properties": {}}
+
+# Appointment date argument shared by the availability and booking functions
+DATE_PROPERTY = {
+    "type": "string",
+    "description": "The appointment date in YYYY-MM-DD format (converted by you from user's natural language)",
+}
+
+SCHEDULE_APPOINTMENT_PARAMETERS = {
+    "type": "object",
+    "properties": {
+        "date": DATE_PROPERTY,
+        "time": {
+            "type": "string",
+            "description": "The appointment time converted to HH:MM format (24-hour)",
+        },
+        "email": {
+            "type": "string",
+            "description": "The patient's email address for calendar invitation",
+        },
+        "patient_name": {
+            "type": "string",
+            "description": "The patient's full name from the intake",
+        },
+        "visit_reasons": {
+            "type": "array",
+            "description": "The visit reasons from the intake",
+            "items": {"type": "string"}
+        },
+    },
+    "required": ["date", "time", "email"],
+}
+
+# Task for the verify node: read the intake back and wait for confirmation
+VERIFY_TASK_PROMPT = """Review all collected information with the patient. Follow these steps:
+1. State their legal name and birth date
+2. Then summarize their prescriptions, allergies, conditions, and visit reasons
+3. Ask if everything is correct
+4. Use the appropriate function based on their response
+
+Format the summary clearly and be thorough in reviewing all details. Wait for explicit confirmation."""
+
+# Summary that replaces the intake conversation once the patient has verified it
+VERIFY_SUMMARY_PROMPT = (
+    "Summarize the patient intake as these lines, writing None for anything not provided:\n"
+    "Name:\nDate of birth:\nPrescriptions (with dosages):\nAllergies:\nConditions:\nVisit reasons:"
+)
+
+VERIFY_CONTEXT_STRATEGY = ContextStrategyConfig(
+    strategy=ContextStrategy.RESET_WITH_SUMMARY,
+    summary_prompt=VERIFY_SUMMARY_PROMPT,
+)
+
+# Placeholders in the flow template for values that change between sessions
+CURRENT_DATE_PLACEHOLDER = "{current_date}"
+CURRENT_TIME_PLACEHOLDER = "{current_time}"
+
+def get_flow_config() -> FlowConfig:
+    """Get the patient intake flow configuration for a new session.
+
+    The node graph is built once; only the scheduling node, whose messages hold
+    the current date and time, is copied and filled in per call.
+    """
+    template = _build_flow_config_template()
+    date_context = get_current_date_context()
+    time_context = get_current_time_context()
+    
+    def fill(messages):
+        return [
+            {
+                **message,
+                "content": message["content"]
+                .replace(CURRENT_DATE_PLACEHOLDER, date_context)
+                .replace(CURRENT_TIME_PLACEHOLDER, time_context),
+            }
+            for message in messages
+        ]
+    
+    schedule_date = dict(template["nodes"]["schedule_date"])
+    schedule_date["role_messages"] = fill(schedule_date["role_messages"])
+    schedule_date["task_messages"] = fill(schedule_date["task_messages"])
+    return {**template, "nodes": {**template["nodes"], "schedule_date": schedule_date}}
+
+
+@functools.cache
+def _build_flow_config_template() -> FlowConfig:
+    """Build the patient intake flow configuration template on first use."""
+    return {
+        "initial_node": "collect_info",
+        "nodes": {
+            "collect_info": {
+                "role_messages": system_messages(
+                    INTAKE_ROLE_PROMPT,
+                ),
+                "task_messages": system_messages(
+                    "Start by introducing yourself and explaining that you'll be conducting a patient intake. Ask for the patient's full name and date of birth. When they provide their birthday in any format, convert it to YYYY-MM-DD format before calling the collect_patient_info function.",
+                ),
+                "functions": [
+                    {
+                        "type": "function",
+                        "function": {
+                            "name": "collect_patient_info",
+                            "handler": collect_patient_info,
+                            "description": "Collect the patient's name and birthday. Both fields are required and will be validated. Once collected, proceed to prescription collection.",
+                            "parameters": {
+                                "type": "object",
+                                "properties": {
+                                    "name": {
+                                        "type": "string",
+                                        "description": "The patient's full name",
+                                    },
+                                    "birthday": {
+                                        "type": "string",
+                                        "description": "The patient's birthdate converted to YYYY-MM-DD format",
+                                    }
                                 },
-                                "birthday": {
-                                    "type": "string",
-                                    "description": "The patient's birthdate converted to YYYY-MM-DD format",
-                                }
+                                "required": ["name", "birthday"],
                             },
-                            "required": ["name", "birthday"],
                         },
                     },
-                },
-            ],
-        },
-        "get_prescriptions": {
-            "task_messages": [
-                {
-                    "role": "system",
-                    "content": "This step is for collecting prescriptions. Ask them what prescriptions they're taking, including the dosage. After recording prescriptions (or confirming none), proceed to allergies.",
-                }
-            ],
-            "functions": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "record_prescriptions",
-                        "handler": record_prescriptions,
-                        "description": "Record the user's prescriptions. Once confirmed, the next step is to collect allergy information.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "prescriptions": {
-                                    "type": "array",
-                                    "items": {
-                                        "type": "object",
-                                        "properties": {
-                                            "medication": {
-                                                "type": "string",
-                                                "description": "The medication's name",
-                                            },
-                                            "dosage": {
-                                                "type": "string",
-                                                "description": "The prescription's dosage",
+                ],
+            },
+            "get_prescriptions": {
+                "task_messages": system_messages(
+                    "This step is for collecting prescriptions. Ask them what prescriptions they're taking, including the dosage. After recording prescriptions (or confirming none), proceed to allergies.",
+                ),
+                "functions": [
+                    {
+                        "type": "function",
+                        "function": {
+                            "name": "record_prescriptions",
+                            "handler": record_prescriptions,
+                            "description": "Record the user's prescriptions. Once confirmed, the next step is to collect allergy information.",
+                            "parameters": {
+                                "type": "object",
+                                "properties": {
+                                    "prescriptions": {
+                                        "type": "array",
+                                        "items": {
+                                            "type": "object",
+                                            "properties": {
+                                                "medication": {
+                                                    "type": "string",
+                                                    "description": "The medication's name",
+                                                },
+                                                "dosage": {
+                                                    "type": "string",
+                                                    "description": "The prescription's dosage",
+                                                },
                                             },
+                                            "required": ["medication", "dosage"],
                                         },
-                                        "required": ["medication", "dosage"],
-                                    },
-                                }
+                                    }
+                                },
+                                "required": ["prescriptions"],
                             },
-                            "required": ["prescriptions"],
                         },
                     },
-                },
-            ],
-        },
-        "get_allergies": {
-            "task_messages": [
-                {
-                    "role": "system",
-                    "content": "Collect allergy information. Ask about any allergies they have. After recording allergies (or confirming none), proceed to medical conditions.",
-                }
-            ],
-            "functions": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "record_allergies",
-                        "handler": record_allergies,
-                        "description": "Record the user's allergies. Once confirmed, then next step is to collect medical conditions.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "allergies": {
-                                    "type": "array",
-                                    "items": {
-                                        "type": "object",
-                                        "properties": {
-                                            "name": {
-                                                "type": "string",
-                                                "description": "What the user is allergic to",
+                ],
+            },
+            "get_allergies": {
+                "task_messages": system_messages(
+                    "Collect allergy information. Ask about any allergies they have. After recording allergies (or confirming none), proceed to medical conditions.",
+                ),
+                "functions": [
+                    {
+                        "type": "function",
+                        "function": {
+                            "name": "record_allergies",
+                            "handler": record_allergies,
+                            "description": "Record the user's allergies. Once confirmed, then next step is to collect medical conditions.",
+                            "parameters": {
+                                "type": "object",
+                                "properties": {
+                                    "allergies": {
+                                        "type": "array",
+                                        "items": {
+                                            "type": "object",
+                                            "properties": {
+                                                "name": {
+                                                    "type": "string",
+                                                    "description": "What the user is allergic to",
+                                                },
                                             },
+                                            "required": ["name"],
                                         },
-                                        "required": ["name"],
-                                    },
-                                }
+                                    }
+                                },
+                                "required": ["allergies"],
                             },
-                            "required": ["allergies"],
                         },
                     },
-                },
-            ],
-        },
-        "get_conditions": {
-            "task_messages": [
-                {
-                    "role": "system",
-                    "content": "Collect medical condition information. Ask about any medical conditions they have. After recording conditions (or confirming none), proceed to visit reasons.",
-                }
-            ],
-            "functions": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "record_conditions",
-                        "handler": record_conditions,
-                        "description": "Record the user's medical conditions. Once confirmed, the next step is to collect visit reasons.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "conditions": {
-                                    "type": "array",
-                                    "items": {
-                                        "type": "object",
-                                        "properties": {
-                                            "name": {
-                                                "type": "string",
-                                                "description": "The user's medical condition",
+                ],
+            },
+            "get_conditions": {
+                "task_messages": system_messages(
+                    "Collect medical condition information. Ask about any medical conditions they have. After recording conditions (or confirming none), proceed to visit reasons.",
+                ),
+                "functions": [
+                    {
+                        "type": "function",
+                        "function": {
+                            "name": "record_conditions",
+                            "handler": record_conditions,
+                            "description": "Record the user's medical conditions. Once confirmed, the next step is to collect visit reasons.",
+                            "parameters": {
+                                "type": "object",
+                                "properties": {
+                                    "conditions": {
+                                        "type": "array",
+                                        "items": {
+                                            "type": "object",
+                                            "properties": {
+                                                "name": {
+                                                    "type": "string",
+                                                    "description": "The user's medical condition",
+                                                },
                                             },
+                                            "required": ["name"],
                                         },
-                                        "required": ["name"],
-                                    },
-                                }
+                                    }
+                                },
+                                "required": ["conditions"],
                             },
-                            "required": ["conditions"],
                         },
                     },
-                },
-            ],
-        },
-        "get_visit_reasons": {
-            "task_messages": [
-                {
-                    "role": "system",
-                    "content": "Collect information about the reason for their visit. Ask what brings them to the doctor today. After recording their reasons, proceed to verification.",
-                }
-            ],
-            "functions": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "record_visit_reasons",
-                        "handler": record_visit_reasons,
-                        "description": "Record the reasons for their visit. Once confirmed, the next step is to verify all information.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "visit_reasons": {
-                                    "type": "array",
-                                    "items": {
-                                        "type": "object",
-                                        "properties": {
-                                            "name": {
-                                                "type": "string",
-                                                "description": "The user's reason for visiting",
+                ],
+            },
+            "get_visit_reasons": {
+                "task_messages": system_messages(
+                    "Collect information about the reason for their visit. Ask what brings them to the doctor today. After recording their reasons, proceed to verification.",
+                ),
+                "functions": [
+                    {
+                        "type": "function",
+                        "function": {
+                            "name": "record_visit_reasons",
+                            "handler": record_visit_reasons,
+                            "description": "Record the reasons for their visit. Once confirmed, the next step is to verify all information.",
+                            "parameters": {
+                                "type": "object",
+                                "properties": {
+                                    "visit_reasons": {
+                                        "type": "array",
+                                        "items": {
+                                            "type": "object",
+                                            "properties": {
+                                                "name": {
+                                                    "type": "string",
+                                                    "description": "The user's reason for visiting",
+                                                },
                                             },
+                                            "required": ["name"],
                                         },
-                                        "required": ["name"],
-                                    },
-                                }
+                                    }
+                                },
+                                "required": ["visit_reasons"],
                             },
-                            "required": ["visit_reasons"],
                         },
                     },
-                },
-            ],
-        },
-        "verify": {
-            "task_messages": [
-                {
-                    "role": "system",
-                    "content": """Review all collected information with the patient. Follow these steps:
-1. State their legal name and birth date
-2. Then summarize their prescriptions, allergies, conditions, and visit reasons
-3. Ask if everything is correct
-4. Use the appropriate function based on their response
-
-Format the summary clearly and be thorough in reviewing all details. Wait for explicit confirmation.""",
-                }
-            ],
-            "context_strategy": ContextStrategyConfig(
-                strategy=ContextStrategy.RESET_WITH_SUMMARY,
-                summary_prompt=(
-                    "Summarize the patient intake conversation in the following structured format:\n\n"
-                    "PATIENT INFORMATION:\n"
-                    "- Legal Name: [patient's full name]\n"
-                    "- Date of Birth: [patient's birth date]\n\n"
-                    "MEDICAL INFORMATION:\n"
-                    "- Prescriptions: [list all medications and dosages, or 'None' if no prescriptions]\n"
-                    "- Allergies: [list all allergies, or 'None' if no allergies]\n"
-                    "- Medical Conditions: [list all conditions, or 'None' if no conditions]\n"
-                    "- Reason for Visit: [list all visit reasons]\n\n"
-                    "Focus on providing complete and accurate information for each section."
+                ],
+            },
+            "verify": {
+                "task_messages": system_messages(
+                    VERIFY_TASK_PROMPT,
                 ),
-            ),
-            "functions": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "revise_information",
-                        "handler": revise_information,
-                        "description": "Return to prescriptions to revise information",
-                        "parameters": {"type": "object", "properties": {}},
-                    },
-                },
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "confirm_information",
-                        "handler": confirm_information,
-                        "description": "Proceed with confirmed information",
-                        "parameters": {"type": "object", "properties": {}},
-                    },
-                },
-            ],
-        },
-        "confirm": {
-            "task_messages": [
-                {
-                    "role": "system",
-                    "content": "Thank them for providing their medical information. Explain that the final step is to schedule their appointment. Use the complete_intake function to proceed to scheduling.",
-                }
-            ],
-            "functions": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "complete_intake",
-                        "handler": complete_intake,
-                        "description": "Complete the intake process and proceed to appointment scheduling",
-                        "parameters": {"type": "object", "properties": {}},
+                "context_strategy": VERIFY_CONTEXT_STRATEGY,
+                "functions": [
+                    {
+                        "type": "function",
+                        "function": {
+                            "name": "revise_information",
+                            "handler": revise_information,
+                            "description": "Return to prescriptions to revise information",
+                            "parameters": EMPTY_PARAMETERS,
+                        },
                     },
-                },
-            ],
-        },
-        "schedule_date": {
-            "role_messages": [
-                {
-                    "role": "system",
-                    "content": f"You are Jessica, a scheduling assistant for Newcast Health Services. You've completed the patient intake and now need to schedule their appointment. Be professional but friendly and helpful.\n\nIMPORTANT: {get_current_datetime_context()}",
-                }
-            ],
-            "task_messages": [
-                {
-                    "role": "system",
-                    "content": "Now that we have completed your medical intake, let's schedule your appointment. Ask when they would like to schedule their appointment. When they mention any date (like 'tomorrow', 'next Monday', 'June 15th', etc.), you should:\n\n1. First call get_current_date to know what today is\n2. Then convert their date request to YYYY-MM-DD format using your understanding of dates\n3. Always present dates back to the user in friendly format like 'Friday July 18th, 2025' (never show YYYY-MM-DD to users)\n4. Use check_availability with the YYYY-MM-DD format",
-                }
-            ],
-            "functions": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "get_current_date",
-                        "handler": get_current_date,
-                        "description": "Get the current date information. Call this first when user mentions any date to understand what today is, then you can convert their relative date expressions to specific dates.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {},
-                            "required": [],
+                    {
+                        "type": "function",
+                        "function": {
+                            "name": "confirm_information",
+                            "handler": confirm_information,
+                            "description": "Proceed to appointment scheduling with the confirmed information",
+                            "parameters": EMPTY_PARAMETERS,
                         },
                     },
-                },
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "check_availability",
-                        "handler": check_availability,
-                        "description": "Check available appointment slots for a given date. You must convert any natural language date to YYYY-MM-DD format before calling this function, but always present dates to users in friendly format like 'Friday July 18th, 2025'.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "date": {
-                                    "type": "string",
-                                    "description": "The desired appointment date in YYYY-MM-DD format (converted by you from user's natural language)",
-                                },
-                                "preferred_time": {
-                                    "type": "string",
-                                    "description": "The preferred time if mentioned by the user (e.g., '10:00', '2pm', '14:30'). Leave empty if no time was specified.",
+                ],
+            },
+            "schedule_date": {
+                "role_messages": system_messages(
+                    f"{SCHEDULING_ROLE_PROMPT}\n\nIMPORTANT: {CURRENT_DATE_PLACEHOLDER}",
+                ),
+                "task_messages": system_messages(
+                    "If the patient has just confirmed their intake information, thank them for providing their medical information and explain that the final step is to schedule their appointment. Ask when they would like to schedule their appointment. When they mention any date (like 'tomorrow', 'next Monday', 'June 15th', etc.), you should:\n\n1. First call get_current_date to know what today is\n2. Then convert their date request to YYYY-MM-DD format using your understanding of dates\n3. Use check_availability with the YYYY-MM-DD format",
+                    # Changes every minute, so it goes last to keep the prefix stable
+                    CURRENT_TIME_PLACEHOLDER,
+                ),
+                # check_availability is called on nearly every turn in this node, so it is
+                # listed first; the date is already in the role message.
+                "functions": [
+                    {
+                        "type": "function",
+                        "function": {
+                            "name": "check_availability",
+                            "handler": check_availability,
+                            "description": "Check available appointment slots for a given date. You must convert any natural language date to YYYY-MM-DD format before calling this function.",
+                            "parameters": {
+                                "type": "object",
+                                "properties": {
+                                    "date": DATE_PROPERTY,
+                                    "preferred_time": {
+                                        "type": "string",
+                                        "description": "The preferred time if mentioned by the user (e.g., '10:00', '2pm', '14:30'). Leave empty if no time was specified.",
+                                    },
                                 },
+                                "required": ["date"],
                             },
-                            "required": ["date"],
                         },
                     },
-                },
-            ],
-        },
-        "schedule_time": {
-            "task_messages": [
-                {
-                    "role": "system",
-                    "content": "You now have the available time slots for the requested date. The date_formatted field contains the proper user-friendly format to show to the patient. Present the available times to the patient in a friendly way and ask them to choose their preferred time. After they select a time, ask for their email address so we can send them a calendar invitation. Once you have both the time and email, schedule the appointment. Use the date_formatted field when mentioning the date to users (never show YYYY-MM-DD format).",
-                }
-            ],
-            "functions": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "schedule_appointment_handler",
-                        "handler": schedule_appointment_handler,
-                        "description": "Schedule an appointment with the selected date and time using the patient information from the intake. Convert any time format to HH:MM 24-hour format.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "date": {
-                                    "type": "string",
-                                    "description": "The appointment date in YYYY-MM-DD format",
-                                },
-                                "time": {
-                                    "type": "string",
-                                    "description": "The appointment time converted to HH:MM format (24-hour)",
-                                },
-                                "email": {
-                                    "type": "string",
-                                    "description": "The patient's email address for calendar invitation",
-                                },
-                                "patient_name": {
-                                    "type": "string",
-                                    "description": "The patient's full name from the intake",
-                                },
-                                "visit_reasons": {
-                                    "type": "array",
-                                    "description": "The visit reasons from the intake",
-                                    "items": {"type": "string"}
-                                },
-                            },
-                            "required": ["date", "time", "email"],
+                    {
+                        "type": "function",
+                        "function": {
+                            "name": "get_current_date",
+                            "handler": get_current_date,
+                            "description": "Get the current date information. Call this first when user mentions any date to understand what today is, then you can convert their relative date expressions to specific dates.",
+                            "parameters": EMPTY_PARAMETERS,
                         },
                     },
-                },
-            ],
-        },
-        "reschedule_appointment": {
-            "task_messages": [
-                {
-                    "role": "system",
-                    "content": "There was an issue scheduling the appointment. Apologize for the inconvenience and offer to try scheduling for a different date or time. Use the reschedule function to start over.",
-                }
-            ],
-            "functions": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "reschedule_appointment",
-                        "handler": reschedule_appointment,
-                        "description": "Start the scheduling process over from the beginning",
-                        "parameters": {"type": "object", "properties": {}},
+                ],
+            },
+            "schedule_time": {
+                "task_messages": system_messages(
+                    "You now have the available time slots for the requested date. The date_formatted field contains the proper user-friendly format to show to the patient. Present the available times to the patient in a friendly way and ask them to choose their preferred time. After they select a time, ask for their email address so we can send them a calendar invitation. Once you have both the time and email, schedule the appointment. Use the date_formatted field when mentioning the date to users.",
+                ),
+                "functions": [
+                    {
+                        "type": "function",
+                        "function": {
+                            "name": "schedule_appointment_handler",
+                            "handler": schedule_appointment_handler,
+                            "description": "Schedule an appointment with the selected date and time using the patient information from the intake. Convert any time format to HH:MM 24-hour format.",
+                            "parameters": SCHEDULE_APPOINTMENT_PARAMETERS,
+                        },
                     },
-                },
-            ],
-        },
-        "confirm_appointment": {
-            "task_messages": [
-                {
-                    "role": "system",
-                    "content": "The appointment has been successfully scheduled! Confirm the appointment details with the patient using the appointment_date_formatted field for the date (never show YYYY-MM-DD to users). Include the date, time, and remind them of their visit reason. Provide any final instructions and use the confirm_final_appointment function to end the conversation.",
-                }
-            ],
-            "functions": [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "confirm_final_appointment",
-                        "handler": confirm_final_appointment,
-                        "description": "Confirm the appointment and end the conversation",
-                        "parameters": {"type": "object", "properties": {}},
+                ],
+            },
+            "reschedule_appointment": {
+                "task_messages": system_messages(
+                    "There was an issue scheduling the appointment. Apologize for the inconvenience and offer to try scheduling for a different date or time. Use the reschedule function to start over.",
+                ),
+                "functions": [
+                    {
+                        "type": "function",
+                        "function": {
+                            "name": "reschedule_appointment",
+                            "handler": reschedule_appointment,
+                            "description": "Start the scheduling process over from the beginning",
+                            "parameters": EMPTY_PARAMETERS,
+                        },
                     },
-                },
-            ],
-        },
-        "end": {
-            "task_messages": [
-                {
-                    "role": "system",
-                    "content": "Thank them for completing both the intake and scheduling their appointment. Remind them to arrive 15 minutes early and bring a valid ID. End the conversation politely.",
-                }
-            ],
-            "post_actions": [{"type": "end_conversation"}],
+                ],
+            },
+            "confirm_appointment": {
+                "task_messages": system_messages(
+                    "The appointment has been successfully scheduled! Confirm the appointment details with the patient using the appointment_date_formatted field for the date. Include the date, time, and remind them of their visit reason. Provide any final instructions and use the confirm_final_appointment function to end the conversation.",
+                ),
+                "functions": [
+                    {
+                        "type": "function",
+                        "function": {
+                            "name": "confirm_final_appointment",
+                            "handler": confirm_final_appointment,
+                            "description": "Confirm the appointment and end the conversation",
+                            "parameters": EMPTY_PARAMETERS,
+                        },
+                    },
+                ],
+            },
+            "end": {
+                "task_messages": system_messages(
+                    "Thank them for completing both the intake and scheduling their appointment. Remind them to arrive 15 minutes early and bring a valid ID. End the conversation politely.",
+                ),
+                "post_actions": [{"type": "end_conversation"}],
+            },
         },
-    },
-}
+    }
@@ -0,0 +1,75 @@
+#
+# Copyright (c) 2024–2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Text aggregators that decide when streamed LLM text is handed to TTS."""
+
+import re
+from typing import Optional
+
+from pipecat.utils.text.base_text_aggregator import BaseTextAggregator
+
+# Sentence-ending punctuation (optionally followed by closing quotes/brackets)
+# that is followed by whitespace. Requiring the whitespace means decimals like
+# "2.5" never split, and the lookbehinds keep common titles together.
+SENTENCE_BOUNDARY_RE = re.compile(
+    r"(?<!\bMr)(?<!\bMs)(?<!\bDr)(?<!\bSt)(?<!\bJr)(?<!\bSr)(?<!\bMrs)"
+    r"[.?!][\"')\]]*\s"
+)
+
+# Clause-level break (comma, semicolon, colon) followed by whitespace.
+CLAUSE_BOUNDARY_RE = re.compile(r"[,;:]\s")
+
+
+class SentenceFlushAggregator(BaseTextAggregator):
+    """Flush LLM text to TTS as early as a natural break allows.
+
+    Text is released at the first sentence boundary, or at a clause boundary
+    once the pending text has at least ``min_clause_words`` words, so synthesis
+    starts while the LLM is still generating. Runaway text without punctuation
+    is flushed at a word boundary after ``max_words`` words. Whatever remains
+    when the LLM response ends is flushed by the TTS service.
+    """
+
+    def __init__(self, min_clause_words: int = 4, max_words: int = 80):
+        self._text = ""
+        self._min_clause_words = min_clause_words
+        self._max_words = max_words
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    async def aggregate(self, text: str) -> Optional[str]:
+        self._text += text
+
+        end = self._find_flush_point()
+        if end is None:
+            return None
+
+        result, self._text = self._text[:end], self._text[end:]
+        return result
+
+    async def handle_interruption(self):
+        self._text = ""
+
+    async def reset(self):
+        self._text = ""
+
+    def _find_flush_point(self) -> Optional[int]:
+        match = SENTENCE_BOUNDARY_RE.search(self._text)
+        if match:
+            return match.end()
+
+        for match in CLAUSE_BOUNDARY_RE.finditer(self._text):
+            if len(self._text[: match.start()].split()) >= self._min_clause_words:
+                return match.end()
+
+        if len(self._text.split()) >= self._max_words:
+            last_space = self._text.rfind(" ")
+            if last_space > 0:
+                return last_space + 1
+
+        return None
@@ -0,0 +1,50 @@
+#
+# Copyright (c) 2024–2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Text filters applied to LLM output before it is sent to TTS."""
+
+import re
+
+from pipecat.utils.text.markdown_text_filter import MarkdownTextFilter
+
+# Characters that can start Markdown/HTML constructs the parent filter rewrites,
+# plus tabs and backslash escapes, which Markdown rendering also changes.
+MARKDOWN_CHARS = frozenset("*_`#[]|~<>&\n\t\\")
+
+# Leading list or blockquote marker, e.g. "- item", "1. item" or "> quote".
+LIST_MARKER_RE = re.compile(r"\s*(?:[-+>]|\d+\.)\s")
+
+# Runs of 5+ repeated characters, which the parent filter deletes.
+REPEATED_RUN_RE = re.compile(r"(\S)\1{4}")
+
+# A chunk of only dashes and colons, which the parent treats as a table rule.
+TABLE_RULE_RE = re.compile(r"\s*[-:]+\s*")
+
+
+class FastMarkdownTextFilter(MarkdownTextFilter):
+    """Markdown filter that skips parsing for chunks of plain prose.
+
+    Most spoken replies are plain prose, so the common case is answered with a
+    few cheap checks instead of a full Markdown render and strip. A chunk only
+    takes the fast path when it has none of the patterns the parent rewrites:
+    Markdown syntax, tabs or backslash escapes, "http(s)://" link schemes, runs
+    of five or more repeated characters, or a lone table rule such as "---".
+    Anything else, and everything while inside a code block or table, goes
+    through the regular filter.
+    """
+
+    async def filter(self, text: str) -> str:
+        if (
+            MARKDOWN_CHARS.isdisjoint(text)
+            and "://" not in text
+            and not LIST_MARKER_RE.match(text)
+            and not REPEATED_RUN_RE.search(text)
+            and not TABLE_RULE_RE.fullmatch(text)
+            and not self._in_code_block
+            and not self._in_table
+        ):
+            return text
+        return await super().filter(text)